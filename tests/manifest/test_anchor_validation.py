@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Tests for anchor_validation.py: the persistent anchor cache and manifest edge cases
+
+Usage:
+    cd tests/manifest
+    python -m unittest test_anchor_validation
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import anchor_validation
+from anchor_validation import ANCHOR_CACHE_FILE, ANCHOR_CACHE_VERSION, AnchorValidator
+
+
+class ManifestDirTestCase(unittest.TestCase):
+    """Builds a manifest directory with one plan location backed by plan/p.md"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.manifest_dir = Path(self._tmp.name)
+        self.cache_file = self.manifest_dir / ANCHOR_CACHE_FILE
+
+        plan_dir = self.manifest_dir / 'plan'
+        plan_dir.mkdir()
+        (plan_dir / 'plan_manifest.json').write_text(json.dumps({
+            'locations': [
+                {'key': 'a', 'file': 'p.md', 'start_anchor': '<!-- anchor: a -->'},
+            ],
+        }))
+        self.md_file = plan_dir / 'p.md'
+        self.md_file.write_text('# Plan\n<!-- anchor: a -->\n')
+
+        arch_dir = self.manifest_dir / 'architecture'
+        arch_dir.mkdir()
+        (arch_dir / 'architecture_manifest.json').write_text(json.dumps({'files': {}}))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write_plan_manifest(self, text: str):
+        (self.manifest_dir / 'plan' / 'plan_manifest.json').write_text(text)
+
+    def validate(self) -> AnchorValidator:
+        """Run a cache-less validation and return the validator"""
+        validator = AnchorValidator(self.manifest_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            validator.validate()
+        return validator
+
+
+class PersistentAnchorCacheTest(ManifestDirTestCase):
+    """Covers hits, misses, invalidation and corrupt caches"""
+
+    def run_validator(self):
+        """Run a validation and return (success, number of markdown scans)"""
+        validator = AnchorValidator(self.manifest_dir, cache_file=self.cache_file)
+        scan = mock.patch.object(
+            AnchorValidator,
+            '_scan_markdown_anchors',
+            autospec=True,
+            side_effect=AnchorValidator._scan_markdown_anchors,
+        )
+        with scan as scanner, contextlib.redirect_stdout(io.StringIO()):
+            success = validator.validate()
+        return success, scanner.call_count
+
+    def read_cache(self):
+        return json.loads(self.cache_file.read_text())
+
+    def test_miss_then_hit(self):
+        self.assertEqual(self.run_validator(), (True, 1))
+        cache = self.read_cache()
+        self.assertEqual(cache['version'], ANCHOR_CACHE_VERSION)
+        self.assertEqual(cache['files']['plan/p.md']['anchors'], ['a'])
+
+        self.assertEqual(self.run_validator(), (True, 0))
+
+    def test_modified_file_is_rescanned(self):
+        self.run_validator()
+        self.md_file.write_text('# Plan\n<!-- anchor: b -->\n')
+
+        success, scans = self.run_validator()
+
+        self.assertFalse(success)
+        self.assertEqual(scans, 1)
+        self.assertEqual(self.read_cache()['files']['plan/p.md']['anchors'], ['b'])
+
+    def test_version_mismatch_discards_cache(self):
+        self.run_validator()
+        cache = self.read_cache()
+        cache['version'] = ANCHOR_CACHE_VERSION + 1
+        self.cache_file.write_text(json.dumps(cache))
+
+        self.assertEqual(self.run_validator(), (True, 1))
+        self.assertEqual(self.read_cache()['version'], ANCHOR_CACHE_VERSION)
+
+    def test_pattern_change_discards_cache(self):
+        self.run_validator()
+        cache = self.read_cache()
+        cache['pattern'] = 'anchor:(.*)'
+        self.cache_file.write_text(json.dumps(cache))
+
+        self.assertEqual(self.run_validator(), (True, 1))
+
+    def test_corrupt_cache_is_ignored(self):
+        self.cache_file.write_text('{not json')
+
+        self.assertEqual(self.run_validator(), (True, 1))
+        self.assertEqual(self.read_cache()['files']['plan/p.md']['anchors'], ['a'])
+
+    def test_malformed_entries_are_misses(self):
+        self.run_validator()
+        st = self.md_file.stat()
+        for entry in (
+            [1, 2],
+            {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'anchors': 'a'},
+            {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'anchors': [['a']]},
+            {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'anchors': [1]},
+        ):
+            cache = self.read_cache()
+            cache['files']['plan/p.md'] = entry
+            self.cache_file.write_text(json.dumps(cache))
+
+            self.assertEqual(self.run_validator(), (True, 1))
+
+    def test_entries_for_deleted_files_are_pruned(self):
+        self.run_validator()
+        cache = self.read_cache()
+        cache['files']['plan/gone.md'] = {'size': 1, 'mtime_ns': 1, 'anchors': ['x']}
+        self.cache_file.write_text(json.dumps(cache))
+
+        self.run_validator()
+
+        self.assertEqual(list(self.read_cache()['files']), ['plan/p.md'])
+
+    def test_stale_stamp_is_not_served(self):
+        self.run_validator()
+        # Same size but a different mtime must still trigger a rescan
+        st = self.md_file.stat()
+        os.utime(self.md_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        self.assertEqual(self.run_validator(), (True, 1))
+
+
+class ManifestEdgeCaseTest(ManifestDirTestCase):
+    """Covers malformed manifests and unusual location paths"""
+
+    def test_truncated_manifest_counts_nothing(self):
+        self.write_plan_manifest(
+            '{"locations": [{"key": "a", "file": "p.md", "start_anchor": "anchor: a"}, {'
+        )
+
+        for ijson_available in (True, False):
+            with self.subTest(ijson=ijson_available), \
+                    mock.patch.object(anchor_validation, 'IJSON_AVAILABLE', ijson_available):
+                validator = self.validate()
+                self.assertEqual(validator.summary['plan'], {'total': 0, 'missing': 0})
+                self.assertTrue(validator.errors[0].startswith('Invalid JSON in plan/'))
+
+    def test_truncated_manifest_drops_warnings_for_streamed_entries(self):
+        self.write_plan_manifest(
+            '{"locations": [{"key": "", "file": "a.md"}, '
+            '{"key": "k", "file": "a.md", "start_anchor": "zz"}, '
+            '{"key": "a", "file": "p.md", "start_anchor": "anch'
+        )
+
+        for ijson_available in (True, False):
+            with self.subTest(ijson=ijson_available), \
+                    mock.patch.object(anchor_validation, 'IJSON_AVAILABLE', ijson_available):
+                validator = self.validate()
+                self.assertEqual(validator.summary['plan'], {'total': 0, 'missing': 0})
+                self.assertEqual(validator.warnings, [])
+                self.assertEqual(len(validator.errors), 1)
+
+    def test_parse_error_is_one_line_with_position(self):
+        self.write_plan_manifest('{"locations": [{"key": "a", "file": "p.md",\n')
+
+        for ijson_available in (True, False):
+            with self.subTest(ijson=ijson_available), \
+                    mock.patch.object(anchor_validation, 'IJSON_AVAILABLE', ijson_available):
+                validator = self.validate()
+                self.assertEqual(len(validator.errors), 1)
+                self.assertNotIn('\n', validator.errors[0])
+                self.assertIn('line 2 column 1', validator.errors[0])
+
+    def test_nan_is_accepted_like_stdlib_json(self):
+        self.write_plan_manifest(
+            '{"locations": ['
+            '{"key": "a", "file": "p.md", "start_anchor": "anchor: a"}, '
+            '{"key": "n", "file": "p.md", "start_anchor": "anchor: a", "weight": NaN}, '
+            '{"key": "z", "file": "p.md", "start_anchor": "anchor: z"}]}'
+        )
+
+        for ijson_available in (True, False):
+            with self.subTest(ijson=ijson_available), \
+                    mock.patch.object(anchor_validation, 'IJSON_AVAILABLE', ijson_available):
+                validator = self.validate()
+                self.assertEqual(validator.summary['plan'], {'total': 3, 'missing': 1})
+                self.assertEqual(validator.errors, ["Missing anchor 'z' in p.md (key: z)"])
+
+    def test_top_level_array_manifest_is_empty(self):
+        self.write_plan_manifest('[1, 2]')
+
+        for ijson_available in (True, False):
+            with self.subTest(ijson=ijson_available), \
+                    mock.patch.object(anchor_validation, 'IJSON_AVAILABLE', ijson_available):
+                validator = self.validate()
+                self.assertEqual(validator.summary['plan'], {'total': 0, 'missing': 0})
+                self.assertEqual(validator.errors, [])
+
+    def test_path_through_regular_file_is_missing(self):
+        self.write_plan_manifest(json.dumps({
+            'locations': [{'key': 'q', 'file': 'p.md/sub.md', 'start_anchor': 'anchor: q'}],
+        }))
+
+        validator = self.validate()
+
+        self.assertEqual(validator.summary['plan'], {'total': 1, 'missing': 1})
+        self.assertEqual(validator.errors, ["Missing anchor 'q' in p.md/sub.md (key: q)"])
+
+    def test_errors_follow_manifest_order(self):
+        (self.manifest_dir / 'plan' / 'o.md').write_text('<!-- anchor: o -->\n')
+        self.write_plan_manifest(json.dumps({
+            'locations': [
+                {'key': 'k1', 'file': 'p.md', 'start_anchor': 'anchor: z'},
+                {'key': 'k2', 'file': 'o.md', 'start_anchor': 'anchor: y'},
+                {'key': 'k3', 'file': 'p.md', 'start_anchor': 'anchor: a'},
+                {'key': 'k4', 'file': 'p.md', 'start_anchor': 'anchor: b'},
+            ],
+        }))
+
+        validator = self.validate()
+
+        self.assertEqual(validator.errors, [
+            "Missing anchor 'z' in p.md (key: k1)",
+            "Missing anchor 'y' in o.md (key: k2)",
+            "Missing anchor 'b' in p.md (key: k4)",
+        ])
+
+    def test_read_errors_are_recorded_in_manifest_order(self):
+        # Directories stat fine but fail on read, exercising the worker error path
+        names = [f'd{i}.md' for i in range(8, 0, -1)]
+        for name in names:
+            (self.manifest_dir / 'plan' / name).mkdir()
+        self.write_plan_manifest(json.dumps({
+            'locations': [
+                {'key': name, 'file': name, 'start_anchor': 'anchor: x'} for name in names
+            ],
+        }))
+
+        validator = self.validate()
+
+        self.assertEqual(
+            [warning.split('/')[-1].split(':')[0] for warning in validator.warnings],
+            names,
+        )
+        self.assertEqual(validator.summary['plan'], {'total': 8, 'missing': 8})
+
+
+class AnchorScanTest(ManifestDirTestCase):
+    """Pins which anchor tags the markdown scan recognises"""
+
+    def scan(self, content: bytes):
+        self.md_file.write_bytes(content)
+        validator = AnchorValidator(self.manifest_dir)
+        return validator.extract_anchors_from_markdown(self.md_file), validator.warnings
+
+    def test_unicode_whitespace_is_allowed_like_str_regex(self):
+        content = (
+            '<!-- anchor:\u00a0nbsp -->\n'
+            '<!--\u3000anchor: ideographic\u2003-->\n'
+            '<!--\u2028anchor:\u0085next-line\u202f-->\n'
+        ).encode('utf-8')
+
+        self.assertEqual(self.scan(content), ({'nbsp', 'ideographic', 'next-line'}, []))
+
+    def test_latin1_nbsp_is_not_whitespace(self):
+        self.assertEqual(self.scan(b'<!-- anchor:\xa0a -->\n'), (set(), []))
+
+    def test_invalid_utf8_is_scanned_without_warning(self):
+        content = b'\xff\xfe not utf-8 \xc3\x28\n<!-- anchor: a -->\n<!-- anchor: b -->\n'
+
+        self.assertEqual(self.scan(content), ({'a', 'b'}, []))
+
+    def test_large_files_use_the_same_pattern(self):
+        padding = b'x' * anchor_validation.MMAP_THRESHOLD
+        content = padding + '\n<!--\u00a0anchor:\u00a0big\u00a0-->\n'.encode('utf-8')
+
+        self.assertEqual(self.scan(content), ({'big'}, []))
+
+
+if __name__ == '__main__':
+    unittest.main()